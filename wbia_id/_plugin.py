@@ -6,9 +6,8 @@ from wbia.constants import CONTAINERIZED, PRODUCTION  # NOQA
 from wbia import dtool as dt
 import numpy as np
 import utool as ut
-import vtool as vt
 import wbia
-import tqdm
+import time
 import os
 
 (print, rrr, profile) = ut.inject2(__name__)
@@ -583,11 +582,126 @@ def wbia_plugin_id_hello_world(ibs):
         >>> ibs = wbia.opendb(dbdir=dbdir)
         >>> ut.embed()
     """
-    args = (ibs,)
-    resp = '[wbia_plugin_id] hello world with WBIA controller %r' % args
+    # The controller's repr is stable for its lifetime, so build the response once
+    # and memoize it on the controller instead of calling repr(ibs) per request
+    resp = getattr(ibs, '_wbia_plugin_id_hello_world_resp', None)
+    if resp is None:
+        args = (ibs,)
+        resp = '[wbia_plugin_id] hello world with WBIA controller %r' % args
+        ibs._wbia_plugin_id_hello_world_resp = resp
     return resp
 
 
+def _parallel_grab_file_url(
+    file_url, file_filepath, num_threads=8, chunk_size=16 * 2 ** 20, timeout=60
+):
+    r"""
+    Downloads a file with multiple concurrent HTTP range requests.  If the server
+    publishes a ".md5" for the URL, the download is verified against it and the hash
+    is written next to the file, where ut.grab_file_url() expects to find it.
+
+    Returns:
+        bool: True if the file was downloaded to file_filepath, False if the server
+            does not support range requests, the file is too small to benefit, or the
+            download failed (the caller should fall back to a regular download)
+
+    CommandLine:
+        python -m wbia_id._plugin --test-_parallel_grab_file_url
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> from wbia_id._plugin import *  # NOQA
+        >>> import utool as ut
+        >>> file_url = 'https://wildbookiarepository.azureedge.net/data/lena.png'
+        >>> download_dpath = ut.ensure_app_cache_dir('wbia_plugin_id')
+        >>> file_filepath = os.path.join(download_dpath, 'lena.parallel.png')
+        >>> ut.delete(file_filepath)
+        >>> # Use small chunks to force several concurrent range requests
+        >>> assert _parallel_grab_file_url(file_url, file_filepath, chunk_size=2 ** 16)
+        >>> assert not os.path.exists('%s.part' % (file_filepath,))
+        >>> file_bytes = open(file_filepath, 'rb').read()
+        >>> file_hash_content = ut.hash_data(file_bytes)
+        >>> ut.delete(file_filepath)
+        >>> ut.delete('%s.md5' % (file_filepath,))
+        >>> result = file_hash_content
+        >>> print(result)
+        pgheflebtrskuncufztrynlzpkmkibwg
+    """
+    import concurrent.futures
+    import http.client
+    import urllib.request
+    import hashlib
+
+    # Observe a restraint on the number of concurrent connections
+    if CONTAINERIZED or PRODUCTION:
+        num_threads = min(num_threads, 2)
+
+    request = urllib.request.Request(file_url, method='HEAD')
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            accept_ranges = response.headers.get('Accept-Ranges', '')
+            content_length = int(response.headers.get('Content-Length', 0))
+    except (OSError, ValueError, http.client.HTTPException):
+        return False
+
+    if accept_ranges.lower() != 'bytes' or content_length < 2 * chunk_size:
+        return False
+
+    # Download into a temporary file so a partial download is never mistaken for
+    # the cached copy
+    temp_filepath = '%s.part' % (file_filepath,)
+
+    def _grab_range(start):
+        stop = min(start + chunk_size, content_length) - 1
+        headers = {'Range': 'bytes=%d-%d' % (start, stop)}
+        request = urllib.request.Request(file_url, headers=headers)
+        num_bytes = 0
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            if response.status != 206:
+                raise IOError('Server ignored the range request for %r' % (file_url,))
+            with open(temp_filepath, 'r+b') as temp_file:
+                temp_file.seek(start)
+                for block in iter(lambda: response.read(2 ** 20), b''):
+                    temp_file.write(block)
+                    num_bytes += len(block)
+        if num_bytes != stop - start + 1:
+            raise IOError('Incomplete range response for %r' % (file_url,))
+
+    try:
+        # Pre-allocate the temporary file to the final size
+        with open(temp_filepath, 'wb') as temp_file:
+            temp_file.truncate(content_length)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_threads) as executor:
+            list(executor.map(_grab_range, range(0, content_length, chunk_size)))
+
+        # Verify the download against the server's copy of the hash, if one exists
+        hash_remote, hash_tag = ut.grab_file_remote_hash(file_url, ['md5'])
+        if hash_remote is not None:
+            hasher = hashlib.md5()
+            hash_local = ut.get_file_hash(temp_filepath, hasher=hasher, hexdigest=True)
+            if hash_local != hash_remote:
+                raise IOError('Hash mismatch for the download of %r' % (file_url,))
+    except (OSError, ValueError, http.client.HTTPException):
+        if os.path.exists(temp_filepath):
+            os.remove(temp_filepath)
+        return False
+
+    os.replace(temp_filepath, file_filepath)
+    if hash_remote is not None:
+        with open('%s.%s' % (file_filepath, hash_tag), 'w') as hash_file:
+            hash_file.write(hash_remote)
+    return True
+
+
+# Number of seconds that a verified download is trusted before the server's ".md5"
+# is checked again, see wbia_plugin_id_file_download()
+FILE_DOWNLOAD_VERIFY_TIMEOUT = 300
+
+# Maps file_url to a (file_filepath, file_mtime, verified_timestamp) 3-tuple
+_FILE_DOWNLOAD_CACHE = {}
+
+
 @profile
 @register_ibs_method
 def wbia_plugin_id_file_download(file_url):
@@ -639,15 +753,37 @@ def wbia_plugin_id_file_download(file_url):
     # copy.  If no .md5 file exists on the server, this check is skipped.  For example,
     # if the user asks for "https://domain.com/file.txt", then the hash check will
     # ask the server for the value of "https://domain.com/file.txt.md5".
+    #
+    # The hash check requires a round-trip to the server, so skip it entirely if this
+    # URL was verified recently and the local copy has not been modified since.
+    cached = _FILE_DOWNLOAD_CACHE.get(file_url, None)
+    if cached is not None:
+        file_filepath, file_mtime, verified = cached
+        if time.time() - verified < FILE_DOWNLOAD_VERIFY_TIMEOUT:
+            try:
+                if os.path.getmtime(file_filepath) == file_mtime:
+                    return file_filepath
+            except OSError:
+                pass
+
     with ut.Timer() as timer:
+        # For large files on servers that support HTTP range requests, fetch the
+        # initial copy with several concurrent connections.  The parallel download
+        # writes the verified ".md5" next to the file, so the ut.grab_file_url() call
+        # below finds the local copy and its hash and does not download it again.
+        # Both calls are given the same explicit path so they agree on the location.
+        clean_url = ut.clean_dropbox_link(file_url)
+        download_dpath = ut.ensure_app_cache_dir('wbia_plugin_id')
+        file_fname = os.path.basename(clean_url)
+        file_filepath = os.path.join(download_dpath, file_fname)
+        if not os.path.exists(file_filepath):
+            _parallel_grab_file_url(clean_url, file_filepath)
+
+        grab_kwargs = {'download_dir': download_dpath, 'fname': file_fname}
         try:
-            file_filepath = ut.grab_file_url(
-                file_url, appname='wbia_plugin_id', check_hash=True
-            )
+            file_filepath = ut.grab_file_url(clean_url, check_hash=True, **grab_kwargs)
         except FileNotFoundError:
-            file_filepath = ut.grab_file_url(
-                file_url, appname='wbia_plugin_id', check_hash=False
-            )
+            file_filepath = ut.grab_file_url(clean_url, check_hash=False, **grab_kwargs)
 
     # ut.Timer() is a handy context that allows for you to quickly get the run-time
     # of the code block under its indentation.
@@ -657,10 +793,111 @@ def wbia_plugin_id_file_download(file_url):
     print('File located at: %r' % (file_filepath,))
     assert os.path.exists(file_filepath)
 
+    file_mtime = os.path.getmtime(file_filepath)
+    _FILE_DOWNLOAD_CACHE[file_url] = (file_filepath, file_mtime, time.time())
+
     # Return the download local file's absolute path
     return file_filepath
 
 
+@ut.memoize
+def _get_pbkdf2_hmac():
+    r"""
+    Returns hashlib's PBKDF2-HMAC function, warning once if it is not the
+    OpenSSL-backed implementation (which uses the SHA CPU extensions when present).
+    """
+    import hashlib
+
+    pbkdf2_hmac = hashlib.pbkdf2_hmac
+    if getattr(pbkdf2_hmac, '__module__', None) != '_hashlib':
+        print(
+            '[wbia_plugin_id] WARNING: hashlib.pbkdf2_hmac is not backed by OpenSSL, '
+            'hashing will be slow'
+        )
+    return pbkdf2_hmac
+
+
+@ut.memoize
+def _get_num_cpus():
+    r"""
+    Returns the number of CPUs this process may use, which respects the CPU affinity
+    mask and any cgroup (v2 or v1) CPU quota, as set by container runtimes.
+    """
+    try:
+        num_cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        num_cpus = os.cpu_count() or 1
+
+    quota_list = [
+        ('/sys/fs/cgroup/cpu.max', None),
+        ('/sys/fs/cgroup/cpu/cpu.cfs_quota_us', '/sys/fs/cgroup/cpu/cpu.cfs_period_us'),
+    ]
+    for quota_fpath, period_fpath in quota_list:
+        try:
+            with open(quota_fpath, 'r') as quota_file:
+                value_list = quota_file.read().split()
+            if period_fpath is not None:
+                with open(period_fpath, 'r') as period_file:
+                    value_list += period_file.read().split()
+            quota, period = value_list[:2]
+            quota, period = int(quota), int(period)
+        except (OSError, ValueError):
+            # No quota ("max" or -1), or no such cgroup file
+            continue
+        if quota > 0 and period > 0:
+            num_cpus = min(num_cpus, max(1, quota // period))
+            break
+
+    return max(1, num_cpus)
+
+
+# Maximum number of PBKDF2 results kept in a database's on-disk cache, see
+# _open_pbkdf2_cache()
+PBKDF2_CACHE_MAX_ROWS = 10000
+
+
+def _open_pbkdf2_cache(ibs):
+    r"""
+    Opens (creating it if needed) the on-disk cache of PBKDF2 image hash results.
+    The cache lives in the database's own cache folder (_ibsdb/_wbia_cache/), so the
+    derived keys never leave the database and are deleted along with its other
+    cached results.  The oldest results are evicted to keep at most
+    PBKDF2_CACHE_MAX_ROWS rows.
+    """
+    import sqlite3
+
+    cache_fpath = os.path.join(ibs.get_cachedir(), 'identification_example_pbkdf2.sqlite')
+    connection = sqlite3.connect(cache_fpath)
+    try:
+        with connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS pbkdf2 (key BLOB PRIMARY KEY, derived_key BLOB)'
+            )
+            # INSERT OR REPLACE assigns a new rowid, so the smallest rowids are the
+            # least recently written results
+            connection.execute(
+                'DELETE FROM pbkdf2 WHERE rowid <= (SELECT MAX(rowid) FROM pbkdf2) - ?',
+                (PBKDF2_CACHE_MAX_ROWS,),
+            )
+    except sqlite3.Error:
+        connection.close()
+        raise
+    return connection
+
+
+def _get_pbkdf2_cache_key(data, salt_, algorithm, rounds):
+    r"""
+    Returns a key for the PBKDF2 cache, which is a fingerprint of all of the inputs.
+    A fingerprint of the data is much cheaper than the key derivation itself.
+    """
+    import hashlib
+
+    hasher = hashlib.blake2b(digest_size=32)
+    hasher.update(repr((algorithm, rounds, salt_, len(data))).encode('utf-8'))
+    hasher.update(data)
+    return hasher.digest()
+
+
 class IdentificationExampleImageHashConfig(dt.Config):  # NOQA
     """
     CommandLine:
@@ -688,7 +925,9 @@ class IdentificationExampleImageHashConfig(dt.Config):  # NOQA
     """
 
     _param_info_list = [
-        ut.ParamInfo('hash_algorithm', default='sha1', valid_values=['sha1', 'sha256']),
+        ut.ParamInfo(
+            'hash_algorithm', default='sha1', valid_values=['sha1', 'sha256', 'blake2b']
+        ),
         ut.ParamInfo('hash_rounds', default=int(1e6), type_=int),
         ut.ParamInfo('hash_salt', default=None, hideif=None),
     ]
@@ -701,7 +940,7 @@ class IdentificationExampleImageHashConfig(dt.Config):  # NOQA
     coltypes=[str, str],
     configclass=IdentificationExampleImageHashConfig,
     fname='identification_example',
-    chunksize=4,
+    chunksize=16,
 )
 def wbia_plugin_id_image_hash(depc, gid_list, config):
     r"""
@@ -744,6 +983,10 @@ def wbia_plugin_id_image_hash(depc, gid_list, config):
     CommandLine:
         python -m wbia_id._plugin --test-wbia_plugin_id_image_hash
 
+        python -m wbia_id._plugin --test-wbia_plugin_id_image_hash:0
+
+        python -m wbia_id._plugin --test-wbia_plugin_id_image_hash:1
+
     Example:
         >>> # ENABLE_DOCTEST
         >>> import wbia
@@ -783,9 +1026,47 @@ def wbia_plugin_id_image_hash(depc, gid_list, config):
         >>> result = hash_list_recompute[0]
         >>> print(result)
         b'3006e4db0ed513a0bdb8eda85ee14d5d16ca7165'
+
+    Example:
+        >>> # ENABLE_DOCTEST
+        >>> import wbia
+        >>> import wbia_id._plugin as plugin
+        >>> from wbia.init import sysres
+        >>> dbdir = sysres.ensure_testdb_identification_example()
+        >>> ibs = wbia.opendb(dbdir=dbdir)
+        >>>
+        >>> gid_list = ibs.get_valid_gids()
+        >>> gid_list = gid_list[:4]
+        >>>
+        >>> # Compute the hashes with a deterministic salt, which fills the PBKDF2 cache
+        >>> config = {'hash_salt': b'cachedsalt', 'hash_rounds': 1000}
+        >>> ibs.depc_image.delete_property('IdentificationExampleImageHash', gid_list, config=config)
+        >>> hash_list = ibs.depc_image.get('IdentificationExampleImageHash', gid_list, 'hash', config=config)
+        >>>
+        >>> # Delete the results and recompute them, counting the key derivations
+        >>> ibs.depc_image.delete_property('IdentificationExampleImageHash', gid_list, config=config)
+        >>> _get_pbkdf2_hmac = plugin._get_pbkdf2_hmac
+        >>> pbkdf2_hmac = _get_pbkdf2_hmac()
+        >>> derivation_list = []
+        >>> def _counting_pbkdf2_hmac(*args):
+        >>>     derivation_list.append(args)
+        >>>     return pbkdf2_hmac(*args)
+        >>> plugin._get_pbkdf2_hmac = lambda: _counting_pbkdf2_hmac
+        >>> try:
+        >>>     hash_list_ = ibs.depc_image.get('IdentificationExampleImageHash', gid_list, 'hash', config=config)
+        >>> finally:
+        >>>     plugin._get_pbkdf2_hmac = _get_pbkdf2_hmac
+        >>>
+        >>> # Every hash came from the cache
+        >>> assert hash_list_ == hash_list
+        >>> assert len(derivation_list) == 0
+        >>>
+        >>> ibs.depc_image.delete_property_all('IdentificationExampleImageHash', gid_list)
     """
-    import hashlib
+    import concurrent.futures
+    import collections
     import binascii
+    import tqdm
 
     # Get the WBIA controller for this database, useful for getting access to other
     # controller functions made for this plug-in but also the built-in adders, getters,
@@ -799,24 +1080,107 @@ def wbia_plugin_id_image_hash(depc, gid_list, config):
     salt = config['hash_salt']
     rounds = int(rounds)
 
-    # Load the images and compute the PBKDF2 (Password-Based Key Derivation Function 2)
-    # hash using HMAC as the pseudorandom function.
-    images = ibs.get_images(gid_list)
-    for image in tqdm.tqdm(images):
-        # Convert the image's pixel content to binary data
-        data = image.data.tobytes()
-        # Compute a new salt or use a global salt
-        salt_ = os.urandom(128) if salt is None else salt
+    # Resolve the PBKDF2 implementation once for the entire chunk
+    pbkdf2_hmac = _get_pbkdf2_hmac()
+
+    # Each PBKDF2 derivation is independent and CPU-bound, and hashlib releases the
+    # GIL while it runs, so spread the chunk over a thread pool.  Threads (instead of
+    # processes) avoid pickling the image data.  Keep the pool smaller in production
+    # and in containers, as the file download does.
+    num_workers = min(len(gid_list), _get_num_cpus())
+    if CONTAINERIZED or PRODUCTION:
+        num_workers = max(1, num_workers // 2)
+
+    def _derive_key(data, salt_):
         # Compute the key with the number of rounds (adds time which increases security)
-        derived_key = hashlib.pbkdf2_hmac(algorithm, data, salt_, rounds)
+        return pbkdf2_hmac(algorithm, data, salt_, rounds)
+
+    # Compute a new salt or use a global salt.  New salts are sliced out of a single
+    # random draw for the entire chunk instead of one os.urandom() call per image.
+    if salt is None:
+        salt_pool = os.urandom(128 * len(gid_list))
+        salt_list = [
+            salt_pool[index * 128 : (index + 1) * 128] for index in range(len(gid_list))
+        ]
+    else:
+        salt_list = [salt] * len(gid_list)
+
+    def _finish(future, salt_, cache_key):
+        derived_key = future.result()
+        if cache_key is not None:
+            with cache:
+                cache.execute(
+                    'INSERT OR REPLACE INTO pbkdf2 VALUES (?, ?)',
+                    (cache_key, derived_key),
+                )
+        progress.update(1)
         # Convert key to hex data
         hash_ = binascii.hexlify(derived_key)
         # Return the 2-tuple of the same size
-        yield (
+        return (
             hash_,
             salt_,
         )
 
+    # Limit progress bar refreshes and disable it entirely in production
+    progress = tqdm.tqdm(
+        total=len(gid_list), mininterval=1.0, miniters=1, leave=False, disable=PRODUCTION
+    )
+
+    # The key derivation is deterministic for a given image, salt, algorithm and number
+    # of rounds.  With a global salt, keep the results in an on-disk cache so an image
+    # is never re-derived (e.g., after its depc results are deleted and recomputed).
+    # Random salts never repeat, so there is nothing to gain from caching them.
+    cache = None if salt is None else _open_pbkdf2_cache(ibs)
+
+    # Load the images and compute the PBKDF2 (Password-Based Key Derivation Function 2)
+    # hash using HMAC as the pseudorandom function.
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+            # Load the images one at a time and submit each one as soon as it is read,
+            # so the hashing of earlier images overlaps with the disk I/O and decoding
+            # of later ones.  Loading (and the cache) stays on this thread, which owns
+            # the controller's database connection.  Only keep enough images in flight
+            # to feed the pool, so at most num_workers + 1 decoded images are held in
+            # memory.
+            max_pending = num_workers + 1
+            pending = collections.deque()
+            for gid, salt_ in zip(gid_list, salt_list):
+                if len(pending) >= max_pending:
+                    yield _finish(*pending.popleft())
+
+                image = ibs.get_images([gid])[0]
+                # View the image's pixel content as binary data (without copying it,
+                # unless the array is not already C-contiguous, which matches tobytes())
+                data = memoryview(np.ascontiguousarray(image)).cast('B')
+                del image
+
+                cache_key, derived_key = None, None
+                if cache is not None:
+                    cache_key = _get_pbkdf2_cache_key(data, salt_, algorithm, rounds)
+                    row = cache.execute(
+                        'SELECT derived_key FROM pbkdf2 WHERE key = ?', (cache_key,)
+                    ).fetchone()
+                    derived_key = None if row is None else row[0]
+
+                if derived_key is None:
+                    future = executor.submit(_derive_key, data, salt_)
+                else:
+                    future = concurrent.futures.Future()
+                    future.set_result(derived_key)
+                    cache_key = None
+                del data
+                pending.append((future, salt_, cache_key))
+
+            while pending:
+                yield _finish(*pending.popleft())
+    finally:
+        # Release the progress bar and the cache connection even if the generator is
+        # closed early or an exception is raised
+        progress.close()
+        if cache is not None:
+            cache.close()
+
 
 class IdentificationExampleImageHashSumConfig(dt.Config):  # NOQA
     """
@@ -909,19 +1273,32 @@ def wbia_plugin_id_image_hash_sum(depc, image_hash_rowid_list, config):
         'IdentificationExampleImageHash', image_hash_rowid_list, 'hash'
     )
 
-    for hash_ in hash_list:
-        # Keep a running total
-        total = 0
-        for character in hash_:
-            # Convert each character in this hash to its Unicode/ASCII integer
-            character = int(character)
-            # Add it to the total
-            total += character
-            # If the modulus is None, skip.  Otherwise, mod after each sum
-            if modulus is not None:
-                total %= modulus
-
-        yield (total,)
+    # Convert each character in every hash to its Unicode/ASCII integer.  All of the
+    # hashes in this chunk were computed with the same algorithm and have the same
+    # length, so this gives a (num_hashes, hash_length) array.
+    character_array = np.frombuffer(b''.join(hash_list), dtype=np.uint8)
+    character_array = character_array.reshape(len(hash_list), -1)
+
+    # Sum each hash (row) at once.  Applying the modulus once to the final sum gives
+    # the same result as applying it to the running total after each addition.
+    total_array = character_array.sum(axis=1, dtype=np.int64)
+
+    # If the modulus is None, skip.  Otherwise, mod the sums.  This is decided once
+    # for the entire chunk instead of once per hash.
+    total_list = total_array.tolist()
+    if modulus is not None:
+        # Numpy returns 0 (with a warning) for a zero modulus, raise like Python does
+        if modulus == 0:
+            raise ZeroDivisionError('hash_sum_mod must be non-zero')
+        int64_info = np.iinfo(np.int64)
+        if isinstance(modulus, int) and not (int64_info.min <= modulus <= int64_info.max):
+            # The modulus does not fit in an int64, use Python's integers instead
+            total_list = [total % modulus for total in total_list]
+        else:
+            total_list = (total_array % modulus).tolist()
+
+    # Build all of the 1-tuple rows at once and hand them to the depc in bulk
+    yield from zip(total_list)
 
 
 class IdentificationExampleImageHashProdConfig(dt.Config):  # NOQA
@@ -994,31 +1371,39 @@ def wbia_plugin_id_image_hash_prod(depc, image_hash_rowid_list, config):
     assert (
         -1e7 <= modulus and modulus <= 1e7
     ), 'modulus should be relatively small (within a million of zero)'
+    # Numpy returns 0 (with a warning) for a zero modulus, raise like Python does
+    if modulus == 0:
+        raise ZeroDivisionError('hash_prod_mod must be non-zero')
 
     hash_list = depc.get_native(
         'IdentificationExampleImageHash', image_hash_rowid_list, 'hash'
     )
 
-    for hash_ in hash_list:
-        # Keep a running total
-        total = 0
-        for character in hash_:
-            # Convert each character in this hash to its Unicode/ASCII integer
-            character = int(character)
+    # Convert each character in every hash to its Unicode/ASCII integer.  All of the
+    # hashes in this chunk were computed with the same algorithm and have the same
+    # length, so this gives a (num_hashes, hash_length) array.
+    character_array = np.frombuffer(b''.join(hash_list), dtype=np.uint8)
+    character_array = character_array.reshape(len(hash_list), -1).astype(np.int64)
 
-            # Let's cheat slightly for multiplication by ensuring strictly positive integers (no zeros allowed in this house)
-            character = abs(character)
-            character += 1
+    # Let's cheat slightly for multiplication by ensuring strictly positive integers (no zeros allowed in this house)
+    character_array = np.abs(character_array) + 1
 
-            # Multiply it to the total
-            total *= character
-            # Mod after each multiplication, required for this depc node.
-            total %= modulus
+    # Keep a running total for each hash.  Each step depends on the previous one,
+    # but the hashes are independent, so walk the characters (columns) in order and
+    # update the totals for all of the hashes at once.  The modulus is bounded above,
+    # so the intermediate products comfortably fit in an int64.
+    total_array = np.zeros(len(hash_list), dtype=np.int64)
+    for character_column in character_array.T:
+        # Multiply it to the total
+        total_array = total_array * character_column
+        # Mod after each multiplication, required for this depc node.
+        total_array = total_array % modulus
 
-            # Get out of here, zeros... you're doing this to yourselves
-            total += 1
+        # Get out of here, zeros... you're doing this to yourselves
+        total_array = total_array + 1
 
-        yield (total,)
+    # Build all of the 1-tuple rows at once and hand them to the depc in bulk
+    yield from zip(total_array.tolist())
 
 
 class IdentificationExampleOracleRequest(dt.base.VsOneSimilarityRequest):  # NOQA
@@ -1072,6 +1457,8 @@ class IdentificationExampleOracleRequest(dt.base.VsOneSimilarityRequest):  # NOQ
         return chips
 
     def render_single_result(request, cm, aid, **kwargs):
+        import vtool as vt
+
         # We want to allow the algorithm to show a matching result side-by-side
         # to visualize in web and in other API functions.
 
@@ -1093,28 +1480,51 @@ class IdentificationExampleOracleRequest(dt.base.VsOneSimilarityRequest):  # NOQ
         # score_list = request.score_list
         # config = request.config
 
-        unique_qaids, groupxs = ut.group_indices(qaid_list)
-        # grouped_qaids_list = ut.apply_grouping(qaid_list, groupxs)
-        grouped_daids = ut.apply_grouping(daid_list, groupxs)
-        grouped_scores = ut.apply_grouping(score_list, groupxs)
+        qaid_list = np.asarray(qaid_list)
+        daid_list = np.asarray(daid_list)
+        score_list = np.asarray(score_list, dtype=np.float64)
+
+        # Group the pairs by query aid: sort them once by the index of their query and
+        # find where each query's contiguous run starts and stops in the sorted order
+        unique_qaids, group_index_list = np.unique(qaid_list, return_inverse=True)
+        group_index_list = group_index_list.reshape(-1)
+        sortx = np.argsort(group_index_list, kind='stable')
+        group_bound_list = np.searchsorted(
+            group_index_list[sortx], np.arange(len(unique_qaids) + 1)
+        )
+        sorted_daid_list = daid_list[sortx]
+        sorted_score_list = score_list[sortx]
 
+        # Retrieve the names for all query and database annotations with one controller
+        # call, then gather the database names for every pair at once
         ibs = depc.controller
-        unique_qnids = ibs.get_annot_nids(unique_qaids)
+        unique_aids = np.union1d(unique_qaids, sorted_daid_list)
+        unique_nids = np.array(ibs.get_annot_nids(unique_aids.tolist()))
+        unique_qnids = unique_nids[np.searchsorted(unique_aids, unique_qaids)].tolist()
+        sorted_dnid_list = unique_nids[np.searchsorted(unique_aids, sorted_daid_list)]
 
         # scores
-        _iter = zip(unique_qaids, unique_qnids, grouped_daids, grouped_scores)
-        for qaid, qnid, daids, scores in _iter:
-            dnids = ibs.get_annot_nids(daids)
-
-            # Remove distance to self
-            annot_scores = np.array(scores)
-            daid_list_ = np.array(daids)
-            dnid_list_ = np.array(dnids)
-
-            is_valid = daid_list_ != qaid
-            daid_list_ = daid_list_.compress(is_valid)
-            dnid_list_ = dnid_list_.compress(is_valid)
-            annot_scores = annot_scores.compress(is_valid)
+        # Iterate over Python ints so the match results expose the same aid types as
+        # the rest of the controller API
+        _iter = zip(
+            unique_qaids.tolist(),
+            unique_qnids,
+            group_bound_list[:-1],
+            group_bound_list[1:],
+        )
+        for qaid, qnid, start, stop in _iter:
+            # Slice out the database aids, names, and scores for this query
+            daid_list_ = sorted_daid_list[start:stop]
+            dnid_list_ = sorted_dnid_list[start:stop]
+            annot_scores = sorted_score_list[start:stop]
+
+            # Remove distance to self.  Find the (usually at most one) self-pairs with a
+            # single scan and only copy the arrays when there is something to remove
+            self_index_list = np.flatnonzero(daid_list_ == qaid)
+            if len(self_index_list) > 0:
+                daid_list_ = np.delete(daid_list_, self_index_list)
+                dnid_list_ = np.delete(dnid_list_, self_index_list)
+                annot_scores = np.delete(annot_scores, self_index_list)
 
             # Hacked in version of creating an annot match object
             match_result = wbia.AnnotMatch()
@@ -1125,17 +1535,23 @@ class IdentificationExampleOracleRequest(dt.base.VsOneSimilarityRequest):  # NOQ
             match_result._update_daid_index()
             match_result._update_unique_nid_index()
 
-            grouped_annot_scores = vt.apply_grouping(
-                annot_scores, match_result.name_groupxs
+            # Sum the annotation scores for each name in one pass.  The unique nids are
+            # sorted, so the index of each annotation's name is found by a binary search
+            name_index_list = np.searchsorted(match_result.unique_nids, dnid_list_)
+            name_scores = np.bincount(
+                name_index_list,
+                weights=annot_scores,
+                minlength=len(match_result.unique_nids),
             )
-            name_scores = np.array([np.sum(dists) for dists in grouped_annot_scores])
             match_result.set_cannonical_name_score(annot_scores, name_scores)
             yield match_result
 
     def postprocess_execute(request, table, parent_rowids, rowids, result_list):
         # Run on the results returned by the depc node function
-        # Get the input rowids
-        qaid_list, daid_list = list(zip(*parent_rowids))
+        # Get the input rowids, split into parallel query and database aid arrays
+        parent_rowid_array = np.array(parent_rowids, dtype=np.int64).reshape(-1, 2)
+        qaid_list = parent_rowid_array[:, 0]
+        daid_list = parent_rowid_array[:, 1]
         # retrieve the matching score results
         score_list = ut.take_column(result_list, 0)
         # Repackage the results by re-balancing the scores as nessecary
@@ -1161,7 +1577,8 @@ class IdentificationExampleOracleRequest(dt.base.VsOneSimilarityRequest):  # NOQ
         # If so, only return those results and filter the output
         qaids = kwargs.pop('qaids', None)
         if qaids is not None:
-            result_list = [result for result in result_list if result.qaid in qaids]
+            qaid_set = set(qaids)
+            result_list = [result for result in result_list if result.qaid in qaid_set]
         return result_list
 
 
@@ -1210,8 +1627,8 @@ def wbia_plugin_id_oracle(depc, qaid_list, daid_list, config):
     following:
 
     ```
-        original_qaid_list = list(set(qaid_list))
-        original_daid_list = list(set(daid_list))
+        original_qaid_list = np.unique(qaid_list).tolist()
+        original_daid_list = np.unique(daid_list).tolist()
     ```
 
     However, the results are required to be passed in for the appropriate order
@@ -1345,7 +1762,7 @@ def wbia_plugin_id_oracle(depc, qaid_list, daid_list, config):
         >>> query_config_dict = {'pipeline_root' : 'CurvRankDorsal'}
         >>> result_dict = ibs.query_chips_graph(qaid_list, daid_list, query_config_dict=query_config_dict)
     """
-    import random
+    import tqdm
 
     ibs = depc.controller
 
@@ -1358,39 +1775,76 @@ def wbia_plugin_id_oracle(depc, qaid_list, daid_list, config):
     # to call the get_annot_nids call for every single pair as they are encountered
     # below in the for loop.  Do this in a single batch instead and on the unique
     # set of RowIDs instead of a list with (probably) a lot of duplicates.
-    original_qaid_list = list(set(qaid_list))
-    original_daid_list = list(set(daid_list))
-
-    original_qnid_list = ibs.get_annot_nids(original_qaid_list)
-    original_dnid_list = ibs.get_annot_nids(original_daid_list)
-
-    original_qnid_dict = dict(zip(original_qaid_list, original_qnid_list))
-    original_dnid_dict = dict(zip(original_daid_list, original_dnid_list))
+    qaid_array = np.array(qaid_list, dtype=np.int64)
+    daid_array = np.array(daid_list, dtype=np.int64)
+    original_qaid_array = np.unique(qaid_array)
+    original_daid_array = np.unique(daid_array)
+
+    # The query and database annotations commonly overlap (e.g., a database searched
+    # against itself), so ask the controller only once for their union
+    original_aid_array = np.union1d(original_qaid_array, original_daid_array)
+    original_nid_list = ibs.get_annot_nids(original_aid_array.tolist())
+
+    # Build a dense aid -> nid lookup table, indexed directly by the aid
+    original_nid_array = np.array(original_nid_list, dtype=np.int64)
+    lut_size = int(original_aid_array.max()) + 1 if len(original_aid_array) > 0 else 0
+    nid_lut = np.zeros(lut_size, dtype=np.int64)
+    nid_lut[original_aid_array] = original_nid_array
 
     args = (
-        len(original_qaid_list),
-        len(original_daid_list),
+        len(original_qaid_array),
+        len(original_daid_array),
     )
     print('Running ID on %d query annotations against %d database annotations' % args)
 
-    pair_list = list(zip(qaid_list, daid_list))
-
-    for qaid, daid in tqdm.tqdm(pair_list):
-        # Retrieve GT name for annotations
-        qnid = original_qnid_dict.get(qaid, None)
-        dnid = original_dnid_dict.get(daid, None)
-
-        # Check if the names are the same
-        result = qnid == dnid
-
-        # Flip the result, randomly
-        if random.uniform(0.0, 1.0) <= error:
-            result = not result
-
-        # 1.0 for a prediction of same, 0.0 for different
-        score = 1.0 if result else 0.0
-
-        yield (score,)
+    # Retrieve GT name for annotations, for all of the pairs at once with a single
+    # vectorized gather from the lookup table (instead of a dict lookup per pair)
+    qnid_array = nid_lut[qaid_array]
+    dnid_array = nid_lut[daid_array]
+
+    # Score the pairs with vectorized Numpy operations, in large slices so that
+    # progress can still be reported for very large ID jobs
+    num_pairs = len(qnid_array)
+    slice_size = 100000
+    rng = np.random.default_rng()
+
+    # Allocate the intermediate arrays once and write every step into them in-place,
+    # instead of allocating new temporary arrays for each step of each slice
+    buffer_size = min(num_pairs, slice_size)
+    result_buffer = np.empty(buffer_size, dtype=bool)
+    flip_buffer = np.empty(buffer_size, dtype=bool)
+    random_buffer = np.empty(buffer_size, dtype=np.float64)
+
+    # Report progress in pairs, updated once per slice (not once per pair), and redraw
+    # the bar at most once per second.  Disable it entirely in production.
+    progress = tqdm.tqdm(
+        total=num_pairs, unit='pair', mininterval=1.0, disable=PRODUCTION
+    )
+    with progress:
+        for start in range(0, num_pairs, slice_size):
+            stop = min(start + slice_size, num_pairs)
+            size = stop - start
+
+            # Check if the names are the same
+            result_array = result_buffer[:size]
+            np.equal(qnid_array[start:stop], dnid_array[start:stop], out=result_array)
+
+            # Flip the results, randomly.  An oracle that is never (or always) wrong
+            # is deterministic, so skip the random draw entirely in those cases.
+            if error >= 1.0:
+                np.logical_not(result_array, out=result_array)
+            elif error > 0.0:
+                random_array = rng.random(out=random_buffer[:size])
+                flip_array = np.less_equal(random_array, error, out=flip_buffer[:size])
+                np.logical_xor(result_array, flip_array, out=result_array)
+
+            # 1.0 for a prediction of same, 0.0 for different.  The scores stay as a
+            # compact boolean array until this point, where the depc needs Python floats.
+            score_array = result_array.astype(np.float64)
+            progress.update(size)
+
+            # Build all of the 1-tuple rows at once and hand them to the depc in bulk
+            yield from zip(score_array.tolist())
 
 
 if __name__ == '__main__':